@@ -15,16 +15,25 @@ Tools orchestrated:
 - get_notebook_info: Get parameter schemas
 - cypher tools: Query network topology (Neo4j)
 """
+import asyncio
 import os
 import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from dotenv import load_dotenv
 import google.generativeai as genai
 
 # LangChain imports
 from langchain.agents import create_agent
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import ToolException
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 # Local imports
@@ -36,6 +45,7 @@ from graph.cypher import (
     show_interfaces_connected_device_tool,
     show_cdp_neighbors_device_tool,
     show_ospf_neighbors_device_tool,
+    show_device_summary_tool,
     show_shortest_path_tool,
     show_all_paths_tool,
 )
@@ -46,22 +56,62 @@ from .prompts import SYSTEM_PROMPT_TEMPLATE, EXAMPLES
 CONFIG_DIR = Path(__file__).parent.parent / "tools" / "configs"
 ENV_PATH = CONFIG_DIR / ".env"
 DEFAULT_MODEL = "gemini-2.5-flash"
+DEFAULT_HISTORY_WINDOW = 12  # messages sent to the LLM per call (None = all)
+
+# Throwaway query for NetworkAgent(warmup=True); its own thread keeps any
+# checkpointer history clean
+WARMUP_QUERY = "Reply with OK."
+WARMUP_THREAD_ID = "__warmup__"
 
 # Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Tools (explicit list - best practice)
+_TOOLS = (
+    # Configuration tools (scholar + executor)
+    scholar_search,
+    execute_notebook,
+    get_notebook_info,
+
+    # Topology tools (cypher)
+    list_devices_tool,
+    show_ospf_neighbors_tool,
+    show_interfaces_connected_device_tool,
+    show_cdp_neighbors_device_tool,
+    show_ospf_neighbors_device_tool,
+    show_device_summary_tool,
+    show_shortest_path_tool,
+    show_all_paths_tool,
+)
+_TOOL_NAMES: Tuple[str, ...] = (
+    "scholar_search",
+    "execute_notebook",
+    "get_notebook_info",
+    "list_devices_tool",
+    "show_ospf_neighbors_tool",
+    "show_interfaces_connected_device_tool",
+    "show_cdp_neighbors_device_tool",
+    "show_ospf_neighbors_device_tool",
+    "show_device_summary_tool",
+    "show_shortest_path_tool",
+    "show_all_paths_tool",
+)
+
+
 # ============================================================================
 # SYSTEM PROMPT BUILDER
 # ============================================================================
 
+@cache
 def _build_system_prompt() -> str:
     """
     Build complete system prompt from prompts.py template + examples.
 
     The new create_agent API only accepts a string for system_prompt,
     so we combine the base template with few-shot examples here.
+    Inputs are module constants, so the result is built once and cached.
     """
     # Add cypher tools to the base template
     cypher_tools_section = """
@@ -70,18 +120,22 @@ def _build_system_prompt() -> str:
 - show_interfaces_connected_device_tool(device): Show connections for a device
 - show_cdp_neighbors_device_tool(device): Show CDP neighbors for a device
 - show_ospf_neighbors_device_tool(device): Show OSPF neighbors for a device
+- show_device_summary_tool(device): Up interfaces + CDP + OSPF neighbors of a device in one call (use when you need more than one of these)
 - show_shortest_path_tool(device1, device2): Find shortest path between two devices
 - show_all_paths_tool(device1, device2): Show all shortest paths between two devices
 """
 
     # Build examples section from prompts.py EXAMPLES
-    examples_section = "\n\nEXAMPLES OF CORRECT REASONING:\n\n"
+    parts = ["\n\nEXAMPLES OF CORRECT REASONING:\n\n"]
     for i, ex in enumerate(EXAMPLES, 1):
-        examples_section += f"Example {i}: {ex['input']}\n"
-        examples_section += f"Thought: {ex['thought']}\n"
-        examples_section += f"Action: {ex['action']}\n"
-        examples_section += f"Observation: {ex['observation']}\n"
-        examples_section += f"Answer: {ex['answer']}\n\n"
+        parts.append(
+            f"Example {i}: {ex['input']}\n"
+            f"Thought: {ex['thought']}\n"
+            f"Action: {ex['action']}\n"
+            f"Observation: {ex['observation']}\n"
+            f"Answer: {ex['answer']}\n\n"
+        )
+    examples_section = "".join(parts)
 
     # Combine: base template + cypher tools + examples
     full_prompt = SYSTEM_PROMPT_TEMPLATE + "\n" + cypher_tools_section + examples_section
@@ -92,13 +146,53 @@ def _build_system_prompt() -> str:
 # INITIALIZATION
 # ============================================================================
 
+_initialized = False
+
+
 def init_environment() -> None:
-    """Load environment variables."""
+    """Load environment variables (once per process)."""
+    global _initialized
+    if _initialized:
+        return
     load_dotenv(ENV_PATH)
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY not set in configs/.env")
     genai.configure(api_key=api_key)
+    _initialized = True
+
+
+# ============================================================================
+# HISTORY WINDOW
+# ============================================================================
+
+class HistoryWindowMiddleware(AgentMiddleware):
+    """
+    Send only the most recent messages of a thread to the LLM.
+
+    The window is widened back to the nearest user message, so a turn's
+    tool calls always travel with their tool results. The checkpointed
+    history itself is left untouched.
+    """
+
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = window
+
+    def _trim(self, request):
+        messages = request.messages
+        if len(messages) <= self.window:
+            return request
+        start = len(messages) - self.window
+        while start > 0 and not isinstance(messages[start], HumanMessage):
+            start -= 1
+        return request.override(messages=messages[start:])
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._trim(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._trim(request))
 
 
 # ============================================================================
@@ -109,7 +203,8 @@ def create_network_agent(
     model_name: str = DEFAULT_MODEL,
     temperature: float = 0,
     verbose: bool = True,
-    checkpointer = None
+    checkpointer = None,
+    history_window: Optional[int] = DEFAULT_HISTORY_WINDOW
 ):
     """
     Create a network configuration agent using LangChain 0.3+ API.
@@ -119,6 +214,7 @@ def create_network_agent(
         temperature: LLM temperature (0 = deterministic)
         verbose: Enable detailed logging
         checkpointer: Optional checkpointer for memory persistence
+        history_window: Recent messages sent to the LLM per call (None = all)
 
     Returns:
         Compiled StateGraph ready to run
@@ -138,22 +234,7 @@ def create_network_agent(
         convert_system_message_to_human=True  # Gemini compatibility
     )
 
-    # Define tools (explicit list - best practice)
-    tools = [
-        # Configuration tools (scholar + executor)
-        scholar_search,
-        execute_notebook,
-        get_notebook_info,
-
-        # Topology tools (cypher)
-        list_devices_tool,
-        show_ospf_neighbors_tool,
-        show_interfaces_connected_device_tool,
-        show_cdp_neighbors_device_tool,
-        show_ospf_neighbors_device_tool,
-        show_shortest_path_tool,
-        show_all_paths_tool,
-    ]
+    tools = list(_TOOLS)
 
     # Build system prompt from prompts.py
     system_prompt = _build_system_prompt()
@@ -163,6 +244,7 @@ def create_network_agent(
         model=llm,
         tools=tools,
         system_prompt=system_prompt,
+        middleware=[HistoryWindowMiddleware(history_window)] if history_window else [],
         checkpointer=checkpointer,
         debug=verbose
     )
@@ -171,6 +253,122 @@ def create_network_agent(
     return agent_graph
 
 
+@lru_cache(maxsize=8)
+def _cached_agent_graph(
+    model_name: str,
+    temperature: float,
+    verbose: bool,
+    history_window: Optional[int]
+):
+    """Build (once) and share the compiled stateless agent graph for identical settings."""
+    return create_network_agent(
+        model_name=model_name,
+        temperature=temperature,
+        verbose=verbose,
+        history_window=history_window
+    )
+
+
+def _agent_graph(
+    model_name: str,
+    temperature: float,
+    verbose: bool,
+    checkpointer,
+    history_window: Optional[int]
+):
+    """
+    Return the agent graph for these settings.
+
+    Graphs with a caller-supplied checkpointer are built per agent and never
+    cached: a cache entry would keep the checkpointer, and all conversation
+    history it holds, alive for the life of the process.
+    """
+    if checkpointer is not None:
+        return create_network_agent(
+            model_name=model_name,
+            temperature=temperature,
+            verbose=verbose,
+            checkpointer=checkpointer,
+            history_window=history_window
+        )
+    return _cached_agent_graph(model_name, temperature, verbose, history_window)
+
+
+# ============================================================================
+# RESPONSE CACHE (read-only queries)
+# ============================================================================
+
+RESPONSE_CACHE_TTL = 60  # seconds
+RESPONSE_CACHE_MAXSIZE = 1024
+
+# Queries starting with these words only read (topology, search, schema)
+READ_ONLY_PREFIXES = ("show", "list", "get", "how")
+
+_response_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def _cache_get(key: tuple) -> Optional[Dict[str, Any]]:
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+        return dict(response)
+
+
+def _cache_put(key: tuple, response: Dict[str, Any]) -> None:
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic() + RESPONSE_CACHE_TTL, response)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_MAXSIZE:
+            _response_cache.popitem(last=False)
+
+
+def clear_response_cache() -> None:
+    """Drop every cached response (e.g. after out-of-band config changes)."""
+    with _response_cache_lock:
+        _response_cache.clear()
+
+
+def _executed_config(messages: List[Any]) -> bool:
+    """True when the run called execute_notebook (cached reads may be stale)."""
+    return any(getattr(message, "name", None) == "execute_notebook" for message in messages)
+
+
+# ============================================================================
+# ERROR HANDLING
+# ============================================================================
+
+# Expected runtime failures: logged on one line, no traceback
+EXPECTED_ERRORS = (ToolException, OutputParserException, TimeoutError, ConnectionError)
+
+_traced_error_types = set()
+
+
+def _error_response(error: Exception) -> Dict[str, Any]:
+    """
+    Log an agent failure and build the error response.
+
+    Unexpected errors get a full traceback the first time their type is
+    seen; repeats (e.g. a flapping backend) are logged on one line.
+    """
+    error_type = type(error)
+    if isinstance(error, EXPECTED_ERRORS) or error_type in _traced_error_types:
+        logger.error(f"Agent execution failed: {error_type.__name__}: {error}")
+    else:
+        _traced_error_types.add(error_type)
+        logger.error(f"Agent execution failed: {error}", exc_info=error)
+    return {
+        "output": f"Error: {error}",
+        "error": str(error)
+    }
+
+
 # ============================================================================
 # HIGH-LEVEL API (Facade Pattern)
 # ============================================================================
@@ -195,7 +393,9 @@ class NetworkAgent:
         model_name: str = DEFAULT_MODEL,
         temperature: float = 0,
         verbose: bool = True,
-        checkpointer = None
+        checkpointer = None,
+        history_window: Optional[int] = DEFAULT_HISTORY_WINDOW,
+        warmup: bool = False
     ):
         """
         Initialize network agent with optional device connection.
@@ -206,20 +406,39 @@ class NetworkAgent:
             temperature: LLM temperature
             verbose: Enable verbose logging
             checkpointer: Optional checkpointer for memory persistence
+            history_window: Recent messages sent to the LLM per call (None = all)
+            warmup: Run one throwaway query in the background so the first
+                real query skips cold-start costs (costs one LLM call; meant
+                for long-lived processes)
         """
         self.device = device
         if device:
             set_device_connection(device)
 
-        self.agent_graph = create_network_agent(
-            model_name=model_name,
-            temperature=temperature,
-            verbose=verbose,
-            checkpointer=checkpointer
+        self.agent_graph = _agent_graph(
+            model_name, temperature, verbose, checkpointer, history_window
         )
 
+        # Responses are only reusable when runs are stateless and deterministic
+        self.model_name = model_name
+        self.cache_responses = checkpointer is None and temperature == 0
+
+        if warmup:
+            threading.Thread(target=self._warmup, name="agent-warmup", daemon=True).start()
+
         logger.info("NetworkAgent initialized")
 
+    def _warmup(self) -> None:
+        """Invoke the graph once (LLM client, tool schemas) and discard the result."""
+        try:
+            self.agent_graph.invoke(
+                {"messages": [{"role": "user", "content": WARMUP_QUERY}]},
+                config={"configurable": {"thread_id": WARMUP_THREAD_ID}}
+            )
+            logger.info("Agent warmup complete")
+        except Exception as e:
+            logger.warning(f"Agent warmup failed: {e}")
+
     def set_device(self, device: Any) -> None:
         """
         Set or update the device connection.
@@ -231,6 +450,33 @@ class NetworkAgent:
         set_device_connection(device)
         logger.info(f"Device connection updated: {device.host if hasattr(device, 'host') else 'Unknown'}")
 
+    def _cache_key(self, query: str) -> Optional[tuple]:
+        """Cache key for a read-only query, or None when it must not be cached."""
+        if not self.cache_responses:
+            return None
+        words = query.split(maxsplit=1)
+        if not words or words[0].lower() not in READ_ONLY_PREFIXES:
+            return None
+        return (query, self.model_name, getattr(self.device, "host", None))
+
+    def _store_response(self, cache_key: Optional[tuple], response: Dict[str, Any]) -> None:
+        """Cache a read-only response; any config execution invalidates the cache."""
+        if _executed_config(response["messages"]):
+            clear_response_cache()
+        elif cache_key is not None:
+            _cache_put(cache_key, response)
+
+    def _finalize(self, result: Dict[str, Any], cache_key: Optional[tuple]) -> Dict[str, Any]:
+        """Build the response dict from a graph result (shared by run/run_async)."""
+        messages = result.get("messages") or ()
+        response = {
+            "output": messages[-1].content if messages else "No response",
+            "messages": messages,
+            "full_result": result
+        }
+        self._store_response(cache_key, response)
+        return response
+
     def run(self, query: str, thread_id: str = "default") -> Dict[str, Any]:
         """
         Run agent with a natural language query.
@@ -246,6 +492,12 @@ class NetworkAgent:
             >>> response = agent.run("Set hostname to CORE-SW-01")
             >>> print(response['output'])
         """
+        cache_key = self._cache_key(query)
+        if cache_key is not None:
+            cached = _cache_get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             # New API uses message-based input
             config = {"configurable": {"thread_id": thread_id}}
@@ -254,20 +506,9 @@ class NetworkAgent:
                 config=config
             )
 
-            # Extract final message
-            final_message = result["messages"][-1].content if result.get("messages") else "No response"
-
-            return {
-                "output": final_message,
-                "messages": result.get("messages", []),
-                "full_result": result
-            }
+            return self._finalize(result, cache_key)
         except Exception as e:
-            logger.error(f"Agent execution failed: {e}", exc_info=True)
-            return {
-                "output": f"Error: {str(e)}",
-                "error": str(e)
-            }
+            return _error_response(e)
 
     async def run_async(self, query: str, thread_id: str = "default"):
         """
@@ -277,6 +518,12 @@ class NetworkAgent:
             query: User's request in natural language
             thread_id: Thread ID for conversation memory
         """
+        cache_key = self._cache_key(query)
+        if cache_key is not None:
+            cached = _cache_get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             config = {"configurable": {"thread_id": thread_id}}
             result = await self.agent_graph.ainvoke(
@@ -284,34 +531,13 @@ class NetworkAgent:
                 config=config
             )
 
-            final_message = result["messages"][-1].content if result.get("messages") else "No response"
-
-            return {
-                "output": final_message,
-                "messages": result.get("messages", []),
-                "full_result": result
-            }
+            return self._finalize(result, cache_key)
         except Exception as e:
-            logger.error(f"Agent execution failed: {e}", exc_info=True)
-            return {
-                "output": f"Error: {str(e)}",
-                "error": str(e)
-            }
+            return _error_response(e)
 
     def get_tools(self) -> List[str]:
         """Get list of available tool names."""
-        return [
-            "scholar_search",
-            "execute_notebook",
-            "get_notebook_info",
-            "list_devices_tool",
-            "show_ospf_neighbors_tool",
-            "show_interfaces_connected_device_tool",
-            "show_cdp_neighbors_device_tool",
-            "show_ospf_neighbors_device_tool",
-            "show_shortest_path_tool",
-            "show_all_paths_tool"
-        ]
+        return list(_TOOL_NAMES)
 
 
 # ============================================================================
@@ -343,34 +569,45 @@ def run_agent_cli(query: str, device: Optional[Any] = None, verbose: bool = True
 # MAIN (for testing)
 # ============================================================================
 
+async def _run_queries(agent: "NetworkAgent", queries: List[str]) -> List[Dict[str, Any]]:
+    """Run independent queries concurrently; results keep the input order."""
+    return await asyncio.gather(*(agent.run_async(query) for query in queries))
+
+
 def main():
     """CLI interface for testing the agent."""
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python network_agent.py 'your query here'")
-        print("\nExample:")
-        print("  python network_agent.py 'Show me all devices'")
-        print("  python network_agent.py 'Enable SSH on CORE-SW-01'")
+        print(
+            "Usage: python network_agent.py 'your query here' ['another query' ...]\n"
+            "\nExample:\n"
+            "  python network_agent.py 'Show me all devices'\n"
+            "  python network_agent.py 'Enable SSH on CORE-SW-01'\n"
+            "  python network_agent.py 'List devices' 'Show OSPF neighbors'"
+        )
         sys.exit(1)
 
-    query = sys.argv[1]
+    queries = sys.argv[1:]
 
     # Create agent (no device connection for read-only queries)
     agent = NetworkAgent(device=None, verbose=True)
 
-    # Run query
-    print(f"\n{'='*60}")
-    print(f"Query: {query}")
-    print(f"{'='*60}\n")
-
-    result = agent.run(query)
-
-    print(f"\n{'='*60}")
-    print("Response:")
-    print(f"{'='*60}")
-    print(result.get("output", "No output"))
-    print()
+    # Each banner is one write instead of one print per line
+    rule = "=" * 60
+
+    if len(queries) == 1:
+        query = queries[0]
+        print(f"\n{rule}\nQuery: {query}\n{rule}\n")
+        results = [agent.run(query)]
+    else:
+        # Independent queries overlap on one shared agent
+        results = asyncio.run(_run_queries(agent, queries))
+
+    for query, result in zip(queries, results):
+        if len(queries) > 1:
+            print(f"\n{rule}\nQuery: {query}\n{rule}\n")
+        print(f"\n{rule}\nResponse:\n{rule}\n{result.get('output', 'No output')}\n")
 
 
 if __name__ == "__main__":
@@ -2,13 +2,14 @@
 Prompt templates for the network configuration ReAct agent.
 
 This module uses LangChain's prompt templates following 2026 best practices:
-- FewShotPromptTemplate for examples
+- Few-shot examples pre-rendered once through a PromptTemplate
 - ChatPromptTemplate for structured conversations
 - PromptTemplate for reusable components
 """
+from types import MappingProxyType
+
 from langchain_core.prompts import (
     ChatPromptTemplate,
-    FewShotPromptTemplate,
     PromptTemplate,
     MessagesPlaceholder,
 )
@@ -37,6 +38,10 @@ REASONING PATTERN (ReAct):
 3. Observation: What did tool return?
 4. Repeat until done
 
+PARALLEL TOOL CALLS:
+- Independent lookups (topology queries, separate searches) → request them together in ONE step; they run concurrently
+- Chain calls only when one needs another's result (search → schema → execute)
+
 PARAMETER EXTRACTION:
 - "hostname to ROUTER-01" → {{"hostname": "ROUTER-01"}}
 - "VLAN 10 named Engineering" → {{"vlan_id": 10, "vlan_name": "Engineering"}}
@@ -55,7 +60,7 @@ SYSTEM_PROMPT = ChatPromptTemplate.from_messages([
 
 
 # ============================================================================
-# FEW-SHOT EXAMPLES (Using LangChain's FewShotPromptTemplate)
+# FEW-SHOT EXAMPLES (pre-rendered once from EXAMPLE_PROMPT)
 # ============================================================================
 
 # Example template
@@ -70,8 +75,8 @@ EXAMPLE_PROMPT = PromptTemplate(
     template=EXAMPLE_TEMPLATE
 )
 
-# Examples for FewShotPromptTemplate
-EXAMPLES = [
+# Few-shot examples (frozen: read-only mappings in a tuple)
+EXAMPLES = tuple(MappingProxyType(example) for example in (
     {
         "input": "How do I enable SSH?",
         "thought": "User wants to know HOW (search task). Use scholar_search.",
@@ -100,14 +105,16 @@ EXAMPLES = [
         "observation": "Both succeeded",
         "answer": "Completed: 1) Enabled SSH v2, 2) Created VLAN 10 'Engineering'"
     }
-]
-
-# Create FewShotPromptTemplate
-FEW_SHOT_PROMPT = FewShotPromptTemplate(
-    examples=EXAMPLES,
-    example_prompt=EXAMPLE_PROMPT,
-    prefix="Here are examples of correct reasoning:\n",
-    suffix="\nNow handle this request:\n",
+))
+
+# Examples are static, so render them once at import; the result is the same
+# text a FewShotPromptTemplate would re-render on every format() call
+FEW_SHOT_PREFIX = "Here are examples of correct reasoning:\n"
+FEW_SHOT_SUFFIX = "\nNow handle this request:\n"
+RENDERED_FEW_SHOT = "\n\n".join(EXAMPLE_PROMPT.format(**example) for example in EXAMPLES)
+
+FEW_SHOT_PROMPT = PromptTemplate(
+    template="\n\n".join((FEW_SHOT_PREFIX, RENDERED_FEW_SHOT, FEW_SHOT_SUFFIX)),
     input_variables=["input"]
 )
 
@@ -129,27 +136,29 @@ CLARIFICATION_PROMPT = PromptTemplate(
 )
 
 
+def _fmt_constraints(info: dict) -> str:
+    """Render integer min/max bounds as ' (min: x, max: y)' (empty otherwise)."""
+    if info.get("type", "string") != "integer":
+        return ""
+    constraints = [
+        f"{label}: {info[key]}"
+        for key, label in (("minimum", "min"), ("maximum", "max"))
+        if key in info
+    ]
+    return f" ({', '.join(constraints)})" if constraints else ""
+
+
 def format_clarification(notebook_id: str, title: str, risk: str, schema: dict) -> str:
     """Format clarification request for missing parameters."""
-    params_list = []
-    required = schema.get("required", [])
     properties = schema.get("properties", {})
-
-    for param in required:
+    params_list = []
+    for param in schema.get("required", []):
         info = properties.get(param, {})
-        ptype = info.get("type", "string")
-        constraints = []
-
-        if ptype == "integer":
-            if "minimum" in info:
-                constraints.append(f"min: {info['minimum']}")
-            if "maximum" in info:
-                constraints.append(f"max: {info['maximum']}")
-
-        constraint_str = f" ({', '.join(constraints)})" if constraints else ""
-        params_list.append(f"- {param} ({ptype}){constraint_str}")
+        params_list.append(f"- {param} ({info.get('type', 'string')}){_fmt_constraints(info)}")
 
-    return CLARIFICATION_PROMPT.format(
+    # Plain str.format on the same template: CLARIFICATION_PROMPT renders
+    # identically but validates its inputs on every call
+    return CLARIFICATION_TEMPLATE.format(
         notebook_title=title,
         notebook_id=notebook_id,
         risk=risk,
@@ -2,14 +2,47 @@
 Graph utilities for Neo4j scripts.
 Shared helpers for config loading and driver lifecycle.
 """
+import atexit
+import json
+import mmap
+import os
+import threading
+from functools import lru_cache
 from pathlib import Path
 import yaml
 from neo4j import GraphDatabase
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def _load_yaml(file_path):
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+ZSTD_SUFFIX = ".zst"
+
+
+# libyaml-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@lru_cache(maxsize=8)
+def _load_yaml_cached(file_path, _mtime_ns):
     with open(file_path, "r") as handle:
-        return yaml.safe_load(handle)
+        return yaml.load(handle, Loader=_YAML_LOADER)
+
+
+def _load_yaml(file_path):
+    """Parse a YAML config, reusing the result until the file changes.
+
+    The parsed data is shared between callers; treat it as read-only.
+    """
+    file_path = os.fspath(file_path)
+    return _load_yaml_cached(file_path, os.stat(file_path).st_mtime_ns)
 
 
 def _config_dir():
@@ -26,25 +59,80 @@ def load_neo4j_connection(config_dir=None):
     return _load_yaml(config_dir / "neo4j.yaml")["connection"]
 
 
+def load_neo4j_database(config_dir=None):
+    config_dir = config_dir or _config_dir()
+    return _load_yaml(config_dir / "neo4j.yaml").get("database", {}).get("name")
+
+
+# Driver pool settings honoured from the neo4j.yaml `connection` block
+DRIVER_POOL_SETTINGS = (
+    "max_connection_lifetime",
+    "max_connection_pool_size",
+    "connection_acquisition_timeout",
+)
+
+
 def create_driver(connection):
+    pool_settings = {
+        key: connection[key] for key in DRIVER_POOL_SETTINGS if key in connection
+    }
+    # Deployment-time override of the configured pool size
+    if os.environ.get("NEO4J_POOL_SIZE"):
+        pool_settings["max_connection_pool_size"] = int(os.environ["NEO4J_POOL_SIZE"])
     return GraphDatabase.driver(
         connection["uri"],
         auth=(connection["user"], connection["password"]),
+        keep_alive=True,
+        **pool_settings,
     )
 
 
+# Drivers are thread-safe and own the connection pool: one per connection
+# config for the whole process, closed at exit
+_DRIVERS = {}
+_DRIVERS_LOCK = threading.Lock()
+
+
+def get_driver(connection):
+    """Return the shared driver for a connection config, creating it once."""
+    key = tuple(sorted(connection.items()))
+    with _DRIVERS_LOCK:
+        driver = _DRIVERS.get(key)
+        if driver is None:
+            driver = _DRIVERS[key] = create_driver(connection)
+        return driver
+
+
+def close_all_drivers():
+    """Close every shared driver (registered to run at interpreter exit)."""
+    with _DRIVERS_LOCK:
+        for driver in _DRIVERS.values():
+            driver.close()
+        _DRIVERS.clear()
+
+
+atexit.register(close_all_drivers)
+
+
 class GraphClient:
-    """Small wrapper for Neo4j driver lifecycle."""
+    """Small wrapper handing out sessions from a shared Neo4j driver."""
 
-    def __init__(self, connection=None, config_dir=None):
-        conn = connection or load_neo4j_connection(config_dir)
-        self._driver = create_driver(conn)
+    def __init__(self, connection=None, config_dir=None, database=None):
+        self._driver = get_driver(connection or load_neo4j_connection(config_dir))
+        # neo4j.yaml is only consulted when the connection came from it too;
+        # an in-code connection without a database uses the home database
+        if database is None and connection is None:
+            database = load_neo4j_database(config_dir)
+        self._database = database
 
-    def session(self):
-        return self._driver.session()
+    def session(self, **kwargs):
+        # Naming the database skips the home-database lookup round-trip
+        kwargs.setdefault("database", self._database)
+        return self._driver.session(**kwargs)
 
     def close(self):
-        self._driver.close()
+        # The driver is shared across clients; close_all_drivers() owns it
+        pass
 
     def __enter__(self):
         return self
@@ -54,26 +142,88 @@ class GraphClient:
         return False
 
 
+# MERGE keys are backed by uniqueness constraints so each MERGE is an index
+# lookup instead of a label scan.
 INDEX_QUERIES = [
-    "CREATE INDEX device_hostname IF NOT EXISTS FOR (d:Device) ON (d.hostname)",
-    "CREATE INDEX interface_id IF NOT EXISTS FOR (i:Interface) ON (i.id)",
-    "CREATE INDEX vlan_id IF NOT EXISTS FOR (v:VLAN) ON (v.id)",
+    "CREATE CONSTRAINT device_hostname IF NOT EXISTS FOR (d:Device) REQUIRE d.hostname IS UNIQUE",
+    "CREATE CONSTRAINT interface_id IF NOT EXISTS FOR (i:Interface) REQUIRE i.id IS UNIQUE",
+    "CREATE CONSTRAINT vlan_id IF NOT EXISTS FOR (v:VLAN) REQUIRE v.id IS UNIQUE",
     "CREATE INDEX snapshot_id IF NOT EXISTS FOR (s:Snapshot) ON (s.id)",
-    "CREATE INDEX mac_address IF NOT EXISTS FOR (m:MACAddress) ON (m.address)",
+    "CREATE CONSTRAINT mac_address IF NOT EXISTS FOR (m:MACAddress) REQUIRE m.address IS UNIQUE",
+    "CREATE CONSTRAINT device_extras_hostname IF NOT EXISTS FOR (x:DeviceExtras) REQUIRE x.hostname IS UNIQUE",
 ]
 
 
+# Constraint name -> (label, property). Older builds created plain indexes
+# under these names/schemas, and CREATE CONSTRAINT ... IF NOT EXISTS fails
+# (not skips) while such an index exists, so those are dropped first.
+UNIQUE_KEYS = {
+    "device_hostname": ("Device", "hostname"),
+    "interface_id": ("Interface", "id"),
+    "vlan_id": ("VLAN", "id"),
+    "mac_address": ("MACAddress", "address"),
+    "device_extras_hostname": ("DeviceExtras", "hostname"),
+}
+
+
+CLEAR_BATCH_SIZE = 10000
+
+
 def clear_db(connection=None, config_dir=None):
     """Delete all nodes and relationships."""
     with GraphClient(connection=connection, config_dir=config_dir) as client:
         with client.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
+            # Batched deletes keep heap and tx log flat on large graphs
+            # (CALL ... IN TRANSACTIONS needs an auto-commit transaction)
+            session.run(
+                "MATCH (n) CALL { WITH n DETACH DELETE n } "
+                f"IN TRANSACTIONS OF {CLEAR_BATCH_SIZE} ROWS"
+            ).consume()
+
+
+def _legacy_indexes_work(tx):
+    """Return names of plain indexes that block the UNIQUE_KEYS constraints."""
+    # Default SHOW INDEXES columns differ by server: 5.x reports
+    # owningConstraint, 4.4 reports uniqueness instead. Only property
+    # (RANGE on 5.x, BTREE on 4.4) indexes can clash with a constraint;
+    # FULLTEXT/TEXT/POINT/LOOKUP indexes are left alone.
+    result = tx.run("SHOW INDEXES WHERE type IN ['RANGE', 'BTREE']")
+    schemas = set(UNIQUE_KEYS.values())
+    legacy = []
+    for record in result:
+        if record.get("owningConstraint") is not None:
+            continue
+        if record.get("uniqueness", "NONUNIQUE") != "NONUNIQUE":
+            continue
+        labels = record["labelsOrTypes"] or []
+        properties = record["properties"] or []
+        schema = (labels[0], properties[0]) if len(labels) == 1 and len(properties) == 1 else None
+        if record["name"] in UNIQUE_KEYS or schema in schemas:
+            legacy.append(record["name"])
+    return legacy
 
 
-def create_indexes(session):
-    """Create Neo4j indexes for performance."""
+def _drop_indexes_work(tx, names):
+    for name in names:
+        escaped = name.replace("`", "``")
+        tx.run(f"DROP INDEX `{escaped}` IF EXISTS")
+
+
+def _create_indexes_work(tx):
     for index_query in INDEX_QUERIES:
-        session.run(index_query)
+        tx.run(index_query)
+
+
+def create_indexes(session):
+    """Create Neo4j indexes and constraints (idempotent, one schema transaction).
+
+    Plain indexes left by older builds on a constrained key are dropped
+    first, in their own transaction.
+    """
+    legacy = session.execute_read(_legacy_indexes_work)
+    if legacy:
+        session.execute_write(_drop_indexes_work, legacy)
+    session.execute_write(_create_indexes_work)
 
 
 def create_devices(session, devices):
@@ -109,15 +259,20 @@ def get_device_count(session):
     return result.single()["total"]
 
 
+def _baseline_work(tx, devices):
+    """Create devices and count them inside one managed transaction."""
+    created = create_devices(tx, devices)
+    return {"created": created, "total": get_device_count(tx)}
+
+
 def build_baseline(connection=None, config_dir=None):
     """Build baseline skeleton and return counts."""
     devices = load_devices(config_dir)
     with GraphClient(connection=connection, config_dir=config_dir) as client:
         with client.session() as session:
+            # Schema changes cannot share a transaction with data writes
             create_indexes(session)
-            created = create_devices(session, devices)
-            total = get_device_count(session)
-            return {"created": created, "total": total}
+            return session.execute_write(_baseline_work, devices)
 
 
 def run_baseline_build():
@@ -132,16 +287,122 @@ def run_clear_db():
     print("Database cleared.")
 
 
+def _encode_snapshot(data, compact):
+    if orjson is not None:
+        return orjson.dumps(data, option=0 if compact else orjson.OPT_INDENT_2)
+    if compact:
+        return json.dumps(data, separators=(",", ":")).encode()
+    return json.dumps(data, indent=2).encode()
+
+
+def _decode_snapshot(payload):
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def json_property(value):
+    """Encode a value as a JSON string property (Neo4j has no map properties)."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("zstandard is required for .zst snapshots (pip install zstandard)")
+
+
+def _iter_snapshot_chunks(data, compact):
+    """Yield the encoded snapshot piece by piece, one list item at a time.
+
+    The indented layout is byte-for-byte what json.dump(data, indent=2)
+    writes: every chunk is shifted right to its nesting level.
+    """
+    newline = b"" if compact else b"\n"
+    pad = b"" if compact else b"  "
+    colon = b":" if compact else b": "
+
+    def encode(value, level):
+        # Nested newlines from the encoder are re-indented to `level`
+        return _encode_snapshot(value, compact).replace(b"\n", b"\n" + pad * level)
+
+    yield b"{"
+    for key_index, (key, value) in enumerate(data.items()):
+        yield (b"," if key_index else b"") + newline + pad + _encode_snapshot(key, True) + colon
+        if isinstance(value, list) and value:
+            yield b"["
+            for item_index, item in enumerate(value):
+                yield (b"," if item_index else b"") + newline + pad * 2 + encode(item, 2)
+            yield newline + pad + b"]"
+        else:
+            yield encode(value, 1)
+    yield newline + b"}"
+
+
+def write_snapshot(json_file, data, compact=False, compress=False, fsync=False):
+    """
+    Write a snapshot dict as JSON (orjson when installed).
+
+    Top-level lists (the devices) are encoded and written one item at a
+    time, so peak memory is one device rather than the whole file.
+    Snapshots are indented for readability, in the same layout as
+    json.dump(data, indent=2); `compact=True` drops the
+    whitespace for smaller files that parse faster. `compress=True`
+    streams the JSON through a zstd (level 3) writer; name the file
+    with a `.json.zst` suffix so readers detect it. `fsync=True` forces
+    the file to disk once before returning; by default the OS flushes
+    it whenever it likes (fastest for bulk runs).
+    """
+    if compress:
+        _require_zstandard()
+
+    with open(json_file, "wb") as handle:
+        if compress:
+            compressor = zstandard.ZstdCompressor(level=3)
+            with compressor.stream_writer(handle, closefd=False) as writer:
+                for chunk in _iter_snapshot_chunks(data, compact):
+                    writer.write(chunk)
+        else:
+            handle.writelines(_iter_snapshot_chunks(data, compact))
+
+        if fsync:
+            handle.flush()
+            os.fsync(handle.fileno())
+
+
+def read_snapshot(json_file):
+    """Load a snapshot file; plain JSON is parsed straight from a read-only mmap."""
+    if str(json_file).endswith(ZSTD_SUFFIX):
+        _require_zstandard()
+        with open(json_file, "rb") as handle:
+            with zstandard.ZstdDecompressor().stream_reader(handle) as reader:
+                return _decode_snapshot(reader.readall())
+
+    if orjson is None:
+        with open(json_file, "r") as handle:
+            return json.load(handle)
+
+    with open(json_file, "rb") as handle:
+        if Path(json_file).stat().st_size == 0:
+            return orjson.loads(b"")  # raises JSONDecodeError like json.load
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
+
+
 def list_snapshots(snapshot_dir=None):
     """Return snapshot files in structured/graph/snapshots as JSON-friendly data."""
     base_dir = Path(snapshot_dir) if snapshot_dir else Path(__file__).parent / "snapshots"
     if not base_dir.exists():
         return {"snapshots": []}
 
-    snapshots = []
-    for path in base_dir.iterdir():
-        if path.is_file() and path.suffix.lower() == ".json":
-            snapshots.append(path.name)
-
-    snapshots.sort()
+    # DirEntry.is_file() uses the readdir type hint: no stat() per entry
+    suffixes = (".json", ".json" + ZSTD_SUFFIX)
+    with os.scandir(base_dir) as entries:
+        snapshots = sorted(
+            entry.name
+            for entry in entries
+            if entry.is_file() and entry.name.lower().endswith(suffixes)
+        )
     return {"snapshots": snapshots}
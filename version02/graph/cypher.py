@@ -8,11 +8,15 @@ Design goals:
 """
 from __future__ import annotations
 
-import json
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from langchain_core.tools import tool
+from neo4j import READ_ACCESS, unit_of_work
 
 try:
     from .base import GraphClient
@@ -28,16 +32,153 @@ logging.basicConfig(level=logging.INFO)
 # INTERNAL HELPERS
 # ============================================================================
 
-def _deduplicate_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _freeze(value: Any) -> Any:
+    """Recursively turn lists/dicts (e.g. path node maps) into hashable tuples."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _record_key(record: Dict[str, Any]) -> tuple:
+    key = tuple(sorted(record.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return _freeze(record)
+    return key
+
+
+def _deduplicate_records(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Yield each distinct record once, in order (works on a live result stream)."""
     seen = set()
-    unique = []
     for record in records:
-        record_hash = json.dumps(record, sort_keys=True)
-        if record_hash in seen:
+        record_key = _record_key(record)
+        if record_key in seen:
             continue
-        seen.add(record_hash)
-        unique.append(record)
-    return unique
+        seen.add(record_key)
+        yield record
+
+
+_client: Optional[GraphClient] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> GraphClient:
+    """Return the shared GraphClient, creating it on first use.
+
+    The driver (and its connection pool) is thread-safe and reused by every
+    query; sessions stay per-call since they are not.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GraphClient()
+    return _client
+
+
+def close_client() -> None:
+    """Drop the shared GraphClient (its driver is closed by close_all_drivers at exit)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+# Query text -> times run. Helpers pass values as $parameters, so each one
+# maps to a single text and a single cached server plan; text that keeps
+# growing this Counter means values are being interpolated into Cypher.
+_QUERY_COUNTS: Counter = Counter()
+_query_counts_lock = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def _normalize(cypher: str) -> str:
+    return " ".join(cypher.split())
+
+
+def _track_queries(queries) -> None:
+    with _query_counts_lock:
+        for cypher, _params in queries:
+            text = _normalize(cypher)
+            _QUERY_COUNTS[text] += 1
+            if _QUERY_COUNTS[text] == 2:
+                logger.debug(f"Query text reused (plan cache hit expected): {text[:80]}")
+
+
+def query_counts() -> Dict[str, int]:
+    """Return how often each (whitespace-normalized) query text has run."""
+    with _query_counts_lock:
+        return dict(_QUERY_COUNTS)
+
+
+def _read_all(tx, queries, deduplicate):
+    # Records are deduplicated as they stream in: no intermediate data() list
+    results = []
+    for cypher, params in queries:
+        records = (record.data() for record in tx.run(cypher, params or {}))
+        results.append(list(_deduplicate_records(records) if deduplicate else records))
+    return results
+
+
+def run_many(
+    queries: Sequence[Tuple[str, Optional[Dict[str, Any]]]],
+    timeout: int = 30,
+    deduplicate: bool = True,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run independent read queries in ONE managed read transaction.
+
+    Returns one record list per (cypher, params) pair, in order. The whole
+    batch shares a session, a connection and a commit, and is retried as a
+    unit on transient errors.
+    """
+    _track_queries(queries)
+    # Read-only helpers: READ_ACCESS lets clusters route them to any reader
+    with _get_client().session(default_access_mode=READ_ACCESS) as session:
+        return session.execute_read(
+            unit_of_work(timeout=timeout)(_read_all), queries, deduplicate
+        )
+
+
+# Short-lived read cache: agents often ask about the same device several
+# times in a row, and snapshots do not change second to second. A feed
+# (usually another process) shows up here within QUERY_CACHE_TTL.
+QUERY_CACHE_TTL = 5  # seconds
+QUERY_CACHE_MAXSIZE = 512
+
+_query_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+
+def _cache_get(key: tuple) -> Optional[List[Dict[str, Any]]]:
+    with _query_cache_lock:
+        entry = _query_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, records = entry
+        if expires_at < time.monotonic():
+            del _query_cache[key]
+            return None
+        _query_cache.move_to_end(key)
+        return list(records)
+
+
+def _cache_put(key: tuple, records: List[Dict[str, Any]]) -> None:
+    with _query_cache_lock:
+        _query_cache[key] = (time.monotonic() + QUERY_CACHE_TTL, records)
+        _query_cache.move_to_end(key)
+        while len(_query_cache) > QUERY_CACHE_MAXSIZE:
+            _query_cache.popitem(last=False)
+
+
+def clear_query_cache() -> None:
+    """Drop every cached query result held by this process."""
+    with _query_cache_lock:
+        _query_cache.clear()
 
 
 def _run_query(
@@ -46,13 +187,13 @@ def _run_query(
     timeout: int = 30,
     deduplicate: bool = True,
 ) -> List[Dict[str, Any]]:
-    with GraphClient() as client:
-        with client.session() as session:
-            result = session.run(cypher, params or {}, timeout=timeout)
-            records = result.data()
-            if deduplicate:
-                return _deduplicate_records(records)
-            return records
+    key = (cypher, _freeze(params or {}), deduplicate)
+    records = _cache_get(key)
+    if records is None:
+        records = run_many([(cypher, params)], timeout=timeout, deduplicate=deduplicate)[0]
+        _cache_put(key, records)
+        records = list(records)
+    return records
 
 
 # ============================================================================
@@ -115,6 +256,36 @@ def show_up_interfaces() -> List[Dict[str, Any]]:
     """)
 
 
+# Several sections about one device in one round-trip, for questions that
+# need them together (show_device_summary). Single-section helpers keep
+# their own narrower queries. Plain OPTIONAL MATCH + collect() (no
+# COLLECT {} subqueries) keeps it valid on Neo4j 4.x and 5.x.
+_DEVICE_VIEW_QUERY = """
+    MATCH (d:Device {hostname: $device})
+    OPTIONAL MATCH (d)-[:HAS_INTERFACE]->(i:Interface)
+    WHERE i.status = 'up' AND i.protocol = 'up'
+    WITH d, i ORDER BY i.name
+    WITH d, collect(CASE WHEN i IS NOT NULL THEN {iface: i.name, ip: i.ip_address} END) AS up_interfaces
+    OPTIONAL MATCH (d)-[:HAS_INTERFACE]->(i:Interface)-[r:CONNECTED_TO {protocol: 'CDP'}]->(ri:Interface)<-[:HAS_INTERFACE]-(rd:Device)
+    WITH d, up_interfaces, i, r, ri, rd ORDER BY rd.hostname, ri.name
+    WITH d, up_interfaces,
+         collect(CASE WHEN r IS NOT NULL THEN {local_iface: i.name, neighbor_device: rd.hostname, neighbor_iface: ri.name, neighbor_ip: r.neighbor_ip} END) AS cdp_neighbors
+    OPTIONAL MATCH (d)-[o:OSPF_NEIGHBOR]->(n:Device)
+    WITH up_interfaces, cdp_neighbors, o, n ORDER BY n.hostname
+    RETURN up_interfaces, cdp_neighbors,
+           collect(CASE WHEN o IS NOT NULL THEN {neighbor: n.hostname, neighbor_id: o.neighbor_id, state: o.state, neighbor_ip: o.neighbor_address, local_iface: o.local_interface} END) AS ospf_neighbors
+"""
+
+
+def show_device_summary(device: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Show up/up interfaces, CDP neighbors and OSPF neighbors of one device together."""
+    views = _run_query(_DEVICE_VIEW_QUERY, {"device": device})
+    sections = ("up_interfaces", "cdp_neighbors", "ospf_neighbors")
+    if not views:
+        return {section: [] for section in sections}
+    return {section: list(_deduplicate_records(views[0][section])) for section in sections}
+
+
 def show_up_interfaces_device(device: str) -> List[Dict[str, Any]]:
     """Show up/up interfaces on a specific device."""
     return _run_query("""
@@ -128,8 +299,7 @@ def show_up_interfaces_device(device: str) -> List[Dict[str, Any]]:
 def show_interfaces_connected_device(device: str) -> List[Dict[str, Any]]:
     """Show interfaces connected to a specific device."""
     return _run_query("""
-        MATCH (d:Device {hostname: $device})-[:HAS_INTERFACE]->(i:Interface)
-        MATCH (i)-[r:CONNECTED_TO]->(ri:Interface)<-[:HAS_INTERFACE]-(rd:Device)
+        MATCH (:Device {hostname: $device})-[:HAS_INTERFACE]->(i:Interface)-[r:CONNECTED_TO]->(ri:Interface)<-[:HAS_INTERFACE]-(rd:Device)
         RETURN i.name AS local_iface, rd.hostname AS remote_device, ri.name AS remote_iface, r.protocol AS protocol
         ORDER BY remote_device, remote_iface
     """, {"device": device})
@@ -138,9 +308,7 @@ def show_interfaces_connected_device(device: str) -> List[Dict[str, Any]]:
 def show_cdp_neighbors_device(device: str) -> List[Dict[str, Any]]:
     """Show CDP neighbors for a specific device."""
     return _run_query("""
-        MATCH (d:Device {hostname: $device})-[:HAS_INTERFACE]->(i:Interface)
-        MATCH (i)-[r:CONNECTED_TO]->(ri:Interface)<-[:HAS_INTERFACE]-(rd:Device)
-        WHERE r.protocol = 'CDP'
+        MATCH (:Device {hostname: $device})-[:HAS_INTERFACE]->(i:Interface)-[r:CONNECTED_TO {protocol: 'CDP'}]->(ri:Interface)<-[:HAS_INTERFACE]-(rd:Device)
         RETURN i.name AS local_iface, rd.hostname AS neighbor_device, ri.name AS neighbor_iface, r.neighbor_ip AS neighbor_ip
         ORDER BY neighbor_device, neighbor_iface
     """, {"device": device})
@@ -155,10 +323,20 @@ def show_ospf_neighbors_device(device: str) -> List[Dict[str, Any]]:
     """, {"device": device})
 
 
+def show_device_extras(device: str) -> List[Dict[str, Any]]:
+    """Show switch tables (VLANs, MACs, STP, trunks) for a specific device."""
+    return _run_query("""
+        MATCH (:Device {hostname: $device})-[:HAS_EXTRAS]->(x:DeviceExtras)
+        RETURN x.vlans AS vlans, x.mac_addresses AS mac_addresses, x.spanning_tree AS spanning_tree, x.trunks AS trunks
+    """, {"device": device})
+
+
+# Path searches are bounded at 30 relationships: each device-to-device hop
+# is three (HAS_INTERFACE, CONNECTED_TO, HAS_INTERFACE), so up to 10 hops
 def show_shortest_path(device1: str, device2: str) -> List[Dict[str, Any]]:
     """Show one shortest path between two devices."""
     return _run_query("""
-        MATCH p = shortestPath((a:Device {hostname: $device1})-[:HAS_INTERFACE|CONNECTED_TO*]-(b:Device {hostname: $device2}))
+        MATCH p = shortestPath((a:Device {hostname: $device1})-[:HAS_INTERFACE|CONNECTED_TO*..30]-(b:Device {hostname: $device2}))
         RETURN [n IN nodes(p) |
           CASE
             WHEN "Device" IN labels(n) THEN n.hostname + " (" + coalesce(n.ip_address,"") + ")"
@@ -170,9 +348,9 @@ def show_shortest_path(device1: str, device2: str) -> List[Dict[str, Any]]:
 
 
 def show_all_paths(device1: str, device2: str) -> List[Dict[str, Any]]:
-    """Show all shortest paths between two devices."""
+    """Show all shortest paths between two devices (at most 50)."""
     return _run_query("""
-        MATCH p = allShortestPaths((a:Device {hostname: $device1})-[:HAS_INTERFACE|CONNECTED_TO*]-(b:Device {hostname: $device2}))
+        MATCH p = allShortestPaths((a:Device {hostname: $device1})-[:HAS_INTERFACE|CONNECTED_TO*..30]-(b:Device {hostname: $device2}))
         RETURN [n IN nodes(p) |
           CASE
             WHEN "Device" IN labels(n) THEN n.hostname + " (" + coalesce(n.ip_address,"") + ")"
@@ -180,6 +358,7 @@ def show_all_paths(device1: str, device2: str) -> List[Dict[str, Any]]:
             ELSE "unknown"
           END
         ] AS path_nodes
+        LIMIT 50
     """, {"device1": device1, "device2": device2})
 
 
@@ -242,6 +421,12 @@ def show_ospf_neighbors_device_tool(device: str):
     return show_ospf_neighbors_device(device)
 
 
+@tool("cypher.show_device_summary")
+def show_device_summary_tool(device: str):
+    """Show a device's up interfaces, CDP neighbors and OSPF neighbors in one call."""
+    return show_device_summary(device)
+
+
 @tool("cypher.show_shortest_path")
 def show_shortest_path_tool(device1: str, device2: str):
     """Show one shortest path between two devices."""
@@ -250,11 +435,15 @@ def show_shortest_path_tool(device1: str, device2: str):
 
 @tool("cypher.show_all_paths")
 def show_all_paths_tool(device1: str, device2: str):
-    """Show all shortest paths between two devices."""
+    """Show all shortest paths between two devices (at most 50)."""
     return show_all_paths(device1, device2)
 
 
 __all__ = [
+    "close_client",
+    "clear_query_cache",
+    "run_many",
+    "query_counts",
     "list_devices",
     # "count_interfaces",
     # "show_topology",
@@ -265,6 +454,8 @@ __all__ = [
     "show_interfaces_connected_device",
     "show_cdp_neighbors_device",
     "show_ospf_neighbors_device",
+    "show_device_summary",
+    "show_device_extras",
     "show_shortest_path",
     "show_all_paths",
     "list_devices_tool",
@@ -277,6 +468,7 @@ __all__ = [
     "show_interfaces_connected_device_tool",
     "show_cdp_neighbors_device_tool",
     "show_ospf_neighbors_device_tool",
+    "show_device_summary_tool",
     "show_shortest_path_tool",
     "show_all_paths_tool",
 ]
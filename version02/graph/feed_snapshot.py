@@ -2,20 +2,112 @@
 Feed Existing JSON Snapshot to Neo4j
 Usage: python feed_snapshot.py <path_to_json_file>
 """
-import json
 import sys
 from pathlib import Path
 
+from neo4j import WRITE_ACCESS
+
 try:
-    from .base import GraphClient
+    from .base import GraphClient, create_indexes, json_property, read_snapshot
 except ImportError:
-    from base import GraphClient
+    from base import GraphClient, create_indexes, json_property, read_snapshot
+
+
+# ============================================================================
+# CYPHER QUERIES (module constants: identical text keeps the plan cache warm)
+# ============================================================================
+
+_Q_CREATE_SNAPSHOT = """
+    CREATE (s:Snapshot {
+        id: $snapshot_id,
+        timestamp: datetime($snapshot_id),
+        device_count: $device_count
+    })
+"""
+
+_Q_MERGE_INTERFACES = """
+    UNWIND $interfaces AS iface
+    MATCH (d:Device {hostname: iface.hostname})
+    MERGE (i:Interface {id: iface.iface_id})
+    SET i.name = iface.name,
+        i.ip_address = iface.ip_address,
+        i.ok = iface.ok,
+        i.method = iface.method,
+        i.status = iface.status,
+        i.protocol = iface.protocol,
+        i.snapshot_id = iface.snapshot_id
+    MERGE (d)-[:HAS_INTERFACE]->(i)
+"""
+
+# Switch tables live on a :DeviceExtras sidecar so the hot Device record
+# stays small; REMOVE drops blobs left on Device by older feeds
+_Q_SET_SWITCH_DATA = """
+    UNWIND $switches AS sw
+    MATCH (d:Device {hostname: sw.hostname})
+    MERGE (x:DeviceExtras {hostname: sw.hostname})
+    MERGE (d)-[:HAS_EXTRAS]->(x)
+    SET x.vlans = sw.vlans,
+        x.mac_addresses = sw.macs,
+        x.spanning_tree = sw.stp,
+        x.trunks = sw.trunks,
+        x.snapshot_id = sw.snapshot_id,
+        d.snapshot_id = sw.snapshot_id
+    REMOVE d.vlans, d.mac_addresses, d.spanning_tree, d.trunks
+"""
+
+_Q_MERGE_CDP_LINKS = """
+    UNWIND $links AS link
+    MATCH (local:Interface {id: link.local_id})
+    MATCH (remote:Interface {id: link.remote_id})
+    MERGE (local)-[r:CONNECTED_TO]->(remote)
+    SET r.protocol = 'CDP',
+        r.neighbor_ip = link.neighbor_ip,
+        r.local_status = link.local_status,
+        r.local_protocol = link.local_protocol,
+        r.remote_status = link.remote_status,
+        r.remote_protocol = link.remote_protocol,
+        r.snapshot_id = link.snapshot_id
+"""
+
+_Q_MERGE_OSPF_LINKS = """
+    UNWIND $links AS link
+    MATCH (local:Device {hostname: link.local_hostname})
+    MATCH (remote:Device {hostname: link.remote_hostname})
+    MERGE (local)-[r:OSPF_NEIGHBOR]->(remote)
+    SET r.neighbor_id = link.neighbor_id,
+        r.state = link.state,
+        r.priority = link.priority,
+        r.dead_time = link.dead_time,
+        r.local_interface = link.local_interface,
+        r.neighbor_address = link.neighbor_address,
+        r.snapshot_id = link.snapshot_id
+"""
 
 
 def load_snapshot(json_file):
     """Load JSON snapshot file"""
-    with open(json_file, 'r') as f:
-        return json.load(f)
+    return read_snapshot(json_file)
+
+
+# Rows per UNWIND statement: large payloads are split so no single Bolt
+# message / parameter list grows unbounded. Every batch still runs in the
+# one feed transaction, so server transaction state grows with the whole
+# snapshot (and the Python payloads are built in full beforehand).
+BATCH_SIZE = 5000
+
+
+def _batched(cypher, key, rows):
+    """Split one UNWIND statement into (cypher, params) pairs of BATCH_SIZE rows."""
+    return [
+        (cypher, {key: rows[start:start + BATCH_SIZE]})
+        for start in range(0, len(rows), BATCH_SIZE)
+    ]
+
+
+def _run_statements(tx, statements):
+    """Run (cypher, params) pairs inside one managed write transaction."""
+    for cypher, params in statements:
+        tx.run(cypher, params)
 
 
 def feed_to_neo4j(network_data):
@@ -23,115 +115,101 @@ def feed_to_neo4j(network_data):
     snapshot_id = network_data['snapshot_id']
 
     with GraphClient() as client:
-        with client.session() as session:
+        # Write-only session: no result paging needed on the ingest path
+        with client.session(default_access_mode=WRITE_ACCESS, fetch_size=-1) as session:
+            # Make sure every MERGE key below is index-backed
+            # (schema changes cannot share a transaction with data writes)
+            create_indexes(session)
+
+            # All data statements below commit together in ONE transaction
+            statements = []
+
             # ==================== PHASE 0: CREATE SNAPSHOT NODE ====================
-            session.run("""
-                CREATE (s:Snapshot {
-                    id: $snapshot_id,
-                    timestamp: datetime($snapshot_id),
-                    device_count: $device_count
-                })
-            """, {
+            statements.append((_Q_CREATE_SNAPSHOT, {
                 'snapshot_id': snapshot_id,
                 'device_count': len(network_data['devices'])
-            })
+            }))
 
             # ==================== PHASE 1: CREATE NODES ====================
-            # Create all interfaces with properties
+            # One pass builds the node payloads together with the lookups
+            # Phase 2 needs: (hostname, interface_name) -> interface_data
+            # and IP -> hostname for OSPF
+            devices = network_data['devices']
             interfaces_payload = []
-            for device_data in network_data['devices']:
-                hostname = device_data['hostname']
+            switch_payload = []
+            iface_by_name = {}
+            device_by_ip = {}
+            add_interface = interfaces_payload.append
+            # Hostnames and interface names repeat across every payload:
+            # interned, each distinct string is stored (and hashed) once
+            intern = sys.intern
+            for device_data in devices:
+                hostname = intern(device_data['hostname'])
+                local_prefix = f"{hostname}:"
                 for iface in device_data['interfaces']:
-                    interfaces_payload.append({
+                    name = intern(iface['interface'])
+                    iface_by_name[(hostname, name)] = iface
+                    iface_get = iface.get
+                    add_interface({
                         'hostname': hostname,
-                        'iface_id': f"{hostname}:{iface['interface']}",
-                        'name': iface['interface'],
-                        'ip_address': iface.get('ip_address', ''),
-                        'ok': iface.get('ok', ''),
-                        'method': iface.get('method', ''),
-                        'status': iface.get('status', ''),
-                        'protocol': iface.get('protocol', ''),
+                        'iface_id': local_prefix + name,
+                        'name': name,
+                        'ip_address': iface_get('ip_address', ''),
+                        'ok': iface_get('ok', ''),
+                        'method': iface_get('method', ''),
+                        'status': iface_get('status', ''),
+                        'protocol': iface_get('protocol', ''),
                         'snapshot_id': snapshot_id
                     })
 
-            session.run("""
-                UNWIND $interfaces AS iface
-                MATCH (d:Device {hostname: iface.hostname})
-                MERGE (i:Interface {id: iface.iface_id})
-                SET i.name = iface.name,
-                    i.ip_address = iface.ip_address,
-                    i.ok = iface.ok,
-                    i.method = iface.method,
-                    i.status = iface.status,
-                    i.protocol = iface.protocol,
-                    i.snapshot_id = iface.snapshot_id
-                MERGE (d)-[:HAS_INTERFACE]->(i)
-            """, {"interfaces": interfaces_payload})
-
-            # Store extra data as device properties (VLANs, MACs, STP, Trunks)
-            switch_payload = []
-            for device_data in network_data['devices']:
-                if device_data['type'] == 'switch':
-                    hostname = device_data['hostname']
+                ip = device_data.get('ip_address')
+                if ip:
+                    device_by_ip[ip] = hostname
 
+                # Store extra switch data on the DeviceExtras sidecar (VLANs, MACs, STP, Trunks)
+                if device_data['type'] == 'switch':
                     switch_payload.append({
                         'hostname': hostname,
-                        'vlans': json.dumps(device_data.get('vlans', [])),
-                        'macs': json.dumps(device_data.get('mac_addresses', [])),
-                        'stp': json.dumps(device_data.get('spanning_tree', {})),
-                        'trunks': json.dumps(device_data.get('trunks', [])),
+                        'vlans': json_property(device_data.get('vlans', [])),
+                        'macs': json_property(device_data.get('mac_addresses', [])),
+                        'stp': json_property(device_data.get('spanning_tree', {})),
+                        'trunks': json_property(device_data.get('trunks', [])),
                         'snapshot_id': snapshot_id
                     })
 
-            session.run("""
-                UNWIND $switches AS sw
-                MATCH (d:Device {hostname: sw.hostname})
-                SET d.vlans = sw.vlans,
-                    d.mac_addresses = sw.macs,
-                    d.spanning_tree = sw.stp,
-                    d.trunks = sw.trunks,
-                    d.snapshot_id = sw.snapshot_id
-            """, {"switches": switch_payload})
+            statements.extend(_batched(_Q_MERGE_INTERFACES, "interfaces", interfaces_payload))
+            statements.extend(_batched(_Q_SET_SWITCH_DATA, "switches", switch_payload))
 
             # ==================== PHASE 2: CREATE RELATIONSHIPS ====================
-            # Build interface lookup: (hostname, interface_name) -> interface_data
-            iface_by_name = {}
-            for device_data in network_data['devices']:
-                hostname = device_data['hostname']
-                for iface in device_data['interfaces']:
-                    iface_by_name[(hostname, iface['interface'])] = iface
-
-            # Build IP-to-Device lookup for OSPF
-            device_by_ip = {}
-            for device_data in network_data['devices']:
-                ip = device_data.get('ip_address')
-                if ip:
-                    device_by_ip[ip] = device_data['hostname']
-
-            # Create CDP physical connections
+            # CDP physical and OSPF logical connections in a single pass
             cdp_links = []
-            for device_data in network_data['devices']:
-                hostname = device_data['hostname']
+            ospf_links = []
+            add_cdp = cdp_links.append
+            add_ospf = ospf_links.append
+            iface_lookup = iface_by_name.get
+            device_lookup = device_by_ip.get
+            for device_data in devices:
+                hostname = intern(device_data['hostname'])
+                local_prefix = f"{hostname}:"
                 for cdp in device_data['cdp_neighbors']:
-                    local_name = cdp.get('local_interface', '')
-                    neighbor_device = cdp.get('neighbor_device', '').split('.')[0]
-                    neighbor_name = cdp.get('neighbor_interface', '')
+                    cdp_get = cdp.get
+                    local_name = intern(cdp_get('local_interface', ''))
+                    neighbor_device = intern(cdp_get('neighbor_device', '').partition('.')[0])
+                    neighbor_name = intern(cdp_get('neighbor_interface', ''))
 
                     if not local_name or not neighbor_device or not neighbor_name:
                         continue
 
                     # Lookup both interfaces
-                    local_iface = iface_by_name.get((hostname, local_name), {})
-                    remote_iface = iface_by_name.get((neighbor_device, neighbor_name), {})
+                    local_iface = iface_lookup((hostname, local_name))
+                    remote_iface = iface_lookup((neighbor_device, neighbor_name))
 
                     # Only create connection if BOTH interfaces exist
                     if local_iface and remote_iface:
-                        local_id = f"{hostname}:{local_name}"
-                        remote_id = f"{neighbor_device}:{neighbor_name}"
-                        cdp_links.append({
-                            'local_id': local_id,
-                            'remote_id': remote_id,
-                            'neighbor_ip': cdp.get('neighbor_ip', ''),
+                        add_cdp({
+                            'local_id': local_prefix + local_name,
+                            'remote_id': f"{neighbor_device}:{neighbor_name}",
+                            'neighbor_ip': cdp_get('neighbor_ip', ''),
                             'local_status': local_iface.get('status', ''),
                             'local_protocol': local_iface.get('protocol', ''),
                             'remote_status': remote_iface.get('status', ''),
@@ -139,59 +217,35 @@ def feed_to_neo4j(network_data):
                             'snapshot_id': snapshot_id
                         })
 
-            session.run("""
-                UNWIND $links AS link
-                MATCH (local:Interface {id: link.local_id})
-                MATCH (remote:Interface {id: link.remote_id})
-                MERGE (local)-[r:CONNECTED_TO]->(remote)
-                SET r.protocol = 'CDP',
-                    r.neighbor_ip = link.neighbor_ip,
-                    r.local_status = link.local_status,
-                    r.local_protocol = link.local_protocol,
-                    r.remote_status = link.remote_status,
-                    r.remote_protocol = link.remote_protocol,
-                    r.snapshot_id = link.snapshot_id
-            """, {"links": cdp_links})
-
-            # Create OSPF logical connections
-            ospf_links = []
-            for device_data in network_data['devices']:
-                hostname = device_data['hostname']
                 for ospf in device_data.get('ospf_neighbors', []):
-                    neighbor_address = ospf.get('address', '')
-                    neighbor_hostname = device_by_ip.get(neighbor_address)
+                    ospf_get = ospf.get
+                    neighbor_address = ospf_get('address', '')
+                    neighbor_hostname = device_lookup(neighbor_address)
 
                     # Only create relationship if we can map IP to Device
                     if neighbor_hostname:
-                        ospf_links.append({
+                        add_ospf({
                             'local_hostname': hostname,
                             'remote_hostname': neighbor_hostname,
-                            'neighbor_id': ospf.get('neighbor_id', ''),
-                            'state': ospf.get('state', ''),
-                            'priority': ospf.get('priority', ''),
-                            'dead_time': ospf.get('dead_time', ''),
-                            'local_interface': ospf.get('interface', ''),
+                            'neighbor_id': ospf_get('neighbor_id', ''),
+                            'state': ospf_get('state', ''),
+                            'priority': ospf_get('priority', ''),
+                            'dead_time': ospf_get('dead_time', ''),
+                            'local_interface': ospf_get('interface', ''),
                             'neighbor_address': neighbor_address,
                             'snapshot_id': snapshot_id
                         })
 
-            session.run("""
-                UNWIND $links AS link
-                MATCH (local:Device {hostname: link.local_hostname})
-                MATCH (remote:Device {hostname: link.remote_hostname})
-                MERGE (local)-[r:OSPF_NEIGHBOR]->(remote)
-                SET r.neighbor_id = link.neighbor_id,
-                    r.state = link.state,
-                    r.priority = link.priority,
-                    r.dead_time = link.dead_time,
-                    r.local_interface = link.local_interface,
-                    r.neighbor_address = link.neighbor_address,
-                    r.snapshot_id = link.snapshot_id
-            """, {"links": ospf_links})
+            statements.extend(_batched(_Q_MERGE_CDP_LINKS, "links", cdp_links))
+            statements.extend(_batched(_Q_MERGE_OSPF_LINKS, "links", ospf_links))
+
+            # One commit for the whole snapshot: all-or-nothing, at the cost
+            # of transaction memory proportional to the snapshot size
+            session.execute_write(_run_statements, statements)
 
     return {
         "snapshot_id": snapshot_id,
-        "devices": len(network_data['devices']),
+        "devices": len(devices),
         "interfaces": len(interfaces_payload),
         "cdp_connections": len(cdp_links),
         "ospf_connections": len(ospf_links),
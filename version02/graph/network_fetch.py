@@ -2,8 +2,10 @@
 Network-Wide Data Fetcher
 Fetch device data and write a JSON snapshot only.
 """
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import json
+import logging
 from pathlib import Path
 import sys
 
@@ -11,128 +13,176 @@ STRUCTURED_ROOT = Path(__file__).resolve().parents[1]
 if str(STRUCTURED_ROOT) not in sys.path:
     sys.path.append(str(STRUCTURED_ROOT))
 
-from graph.base import load_devices
+from graph.base import load_devices, write_snapshot
 from tools.collector import Collector
 
 
+# Logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Snapshot file timestamp: isoformat() with ':' swapped for '-'
+SNAPSHOT_FILE_TIME_FORMAT = "%Y-%m-%dT%H-%M-%S.%f"
+
+# Collector calls per device type: snapshot key -> Collector method
+ROUTER_CALLS = {
+    "interfaces": "get_interface_brief",
+    "cdp_neighbors": "get_cdp_neighbors",
+    "ospf_neighbors": "get_ospf_neighbors",
+}
+
+SWITCH_CALLS = {
+    "interfaces": "get_interface_brief",
+    "cdp_neighbors": "get_cdp_neighbors",
+    "vlans": "get_vlan_brief",
+    "trunks": "get_trunk_interfaces",
+    "mac_addresses": "get_mac_address_table",
+    "spanning_tree": "get_spanning_tree_summary",
+    "ospf_neighbors": "get_ospf_neighbors",
+}
+
+# Calls allowed to fail on switches (no OSPF on L2 switches)
+SWITCH_OPTIONAL_CALLS = {"ospf_neighbors"}
+
+# Default cap on parallel device workers: fetches wait on the network,
+# not the CPU, so the pool is sized by device count rather than cores
+MAX_FETCH_WORKERS = 32
+
+
 class NetworkFetcher:
     """Fetches data from ALL devices in a single snapshot"""
 
     def __init__(self):
         self.devices = load_devices()
 
+    @staticmethod
+    def _collector(hostname, device_config):
+        return Collector(
+            hostname,
+            device_config['mgmt_ip'],
+            device_config['mgmt_port'],
+            device_config['credentials']
+        )
+
+    def _run_calls(self, hostname, device_config, calls, optional_calls=()):
+        """
+        Run collector calls for one device over a single session.
+
+        Calls are not fanned out over parallel sessions: IOS only has a
+        handful of VTY lines, console (telnet) ports carry one session per
+        line, and a Netmiko channel is not safe for concurrent use.
+        """
+        with self._collector(hostname, device_config) as connected:
+            logger.info(f"[{hostname}] Connected")
+            return connected.collect_all(calls, optional_calls)
+
     def fetch_device(self, hostname, device_config):
         """Fetch data from a single device"""
-        print(f"\n{'='*70}")
-        print(f"FETCHING: {hostname} ({device_config['type']})")
-        print('='*70)
+        logger.info(f"FETCHING: {hostname} ({device_config['type']})")
 
         try:
-            print(f"[1] Connecting to {hostname}...")
-            collector = Collector(
-                hostname,
-                device_config['mgmt_ip'],
-                device_config['mgmt_port'],
-                device_config['credentials']
-            )
-
-            with collector as connected:
-                print("[OK] Connected")
-
-                print("\n[2] Fetching interfaces...")
-                interfaces = connected.get_interface_brief()
-                print(f"[OK] Found {len(interfaces)} interfaces")
-
-                print("\n[3] Fetching CDP neighbors...")
-                cdp_neighbors = connected.get_cdp_neighbors()
-                print(f"[OK] Found {len(cdp_neighbors)} CDP neighbors")
-
-                data = {
-                    "hostname": hostname,
-                    "type": device_config['type'],
-                    "ip_address": device_config.get('ip_address', ''),
-                    "interfaces": interfaces,
-                    "cdp_neighbors": cdp_neighbors
-                }
-
-                # Router-specific or switch-specific data
-                if device_config['type'] == 'router':
-                    print("\n[4] Fetching OSPF neighbors...")
-                    ospf_neighbors = connected.get_ospf_neighbors()
-                    print(f"[OK] Found {len(ospf_neighbors)} OSPF neighbors")
-                    data['ospf_neighbors'] = ospf_neighbors
+            logger.info(f"[{hostname}] Connecting...")
+            if device_config['type'] == 'router':
+                results = self._run_calls(hostname, device_config, ROUTER_CALLS)
+            else:
+                results = self._run_calls(
+                    hostname, device_config, SWITCH_CALLS, SWITCH_OPTIONAL_CALLS
+                )
+
+            for key, value in results.items():
+                if key == 'spanning_tree':
+                    logger.info(f"[{hostname}] Got STP data for {len(value.get('vlan_stats', []))} VLANs")
                 else:
-                    print("\n[4] Fetching VLANs...")
-                    vlans = connected.get_vlan_brief()
-                    print(f"[OK] Found {len(vlans)} VLANs")
-
-                    print("\n[5] Fetching trunk interfaces...")
-                    trunks = connected.get_trunk_interfaces()
-                    print(f"[OK] Found {len(trunks)} trunk interfaces")
-
-                    print("\n[6] Fetching MAC address table...")
-                    macs = connected.get_mac_address_table()
-                    print(f"[OK] Found {len(macs)} MAC addresses")
-
-                    print("\n[7] Fetching spanning tree...")
-                    stp = connected.get_spanning_tree_summary()
-                    print(f"[OK] Got STP data for {len(stp.get('vlan_stats', []))} VLANs")
-
-                    # Check for OSPF on L3 switches
-                    try:
-                        print("\n[8] Fetching OSPF neighbors (if L3 switch)...")
-                        ospf_neighbors = connected.get_ospf_neighbors()
-                        print(f"[OK] Found {len(ospf_neighbors)} OSPF neighbors")
-                    except Exception:
-                        ospf_neighbors = []
-                        print("[OK] No OSPF (L2 switch)")
-
-                    data['vlans'] = vlans
-                    data['trunks'] = trunks
-                    data['mac_addresses'] = macs
-                    data['spanning_tree'] = stp
-                    data['ospf_neighbors'] = ospf_neighbors
-
-            print(f"[OK] {hostname} fetch complete\n")
+                    logger.info(f"[{hostname}] Found {len(value)} {key.replace('_', ' ')}")
+
+            data = {
+                "hostname": hostname,
+                "type": device_config['type'],
+                "ip_address": device_config.get('ip_address', ''),
+            }
+            data.update(results)
+
+            logger.info(f"[{hostname}] Fetch complete")
             return data
 
         except Exception as e:
-            print(f"[ERROR] Failed to fetch {hostname}: {e}")
+            logger.error(f"[{hostname}] Failed to fetch: {e}")
             return None
 
-    def fetch_all(self):
-        """Fetch data from all enabled devices"""
+    def fetch_all(self, hostnames=None, workers=None, compact=False, compress=False, fsync=False):
+        """
+        Fetch data from all enabled devices (or only `hostnames`).
+
+        Devices are fetched in parallel worker threads, one device per
+        worker (the work is SSH/telnet I/O, which releases the GIL), up to
+        MAX_FETCH_WORKERS at once by default; `workers=1` fetches them
+        serially.
+        """
         # Generate SINGLE snapshot ID for entire network
-        snapshot_id = datetime.now().isoformat()
-        snapshot_id_clean = snapshot_id.replace(':', '-')
+        now = datetime.now()
+        snapshot_id = now.isoformat()
+        snapshot_id_clean = now.strftime(SNAPSHOT_FILE_TIME_FORMAT)
 
         all_data = {
             "snapshot_id": snapshot_id,
             "devices": []
         }
 
-        # Fetch from all enabled devices
-        for hostname, config in self.devices.items():
-            if config.get('enabled', True):
-                device_data = self.fetch_device(hostname, config)
-                if device_data:
-                    all_data['devices'].append(device_data)
+        targets = [
+            (hostname, config)
+            for hostname, config in self.devices.items()
+            if config.get('enabled', True) and (not hostnames or hostname in hostnames)
+        ]
+        workers = min(workers or MAX_FETCH_WORKERS, len(targets))
+
+        # Fetch from all enabled devices (results keep inventory order)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self.fetch_device, *zip(*targets)))
+        else:
+            results = [self.fetch_device(hostname, config) for hostname, config in targets]
+
+        all_data['devices'] = [device_data for device_data in results if device_data]
 
         # Save complete network snapshot to JSON
         output_dir = Path(__file__).parent / 'snapshots'
         output_dir.mkdir(exist_ok=True)
-        json_file = output_dir / f"network_{snapshot_id_clean}.json"
+        suffix = ".json.zst" if compress else ".json"
+        json_file = output_dir / f"network_{snapshot_id_clean}{suffix}"
 
-        with open(json_file, 'w') as f:
-            json.dump(all_data, f, indent=2)
+        write_snapshot(json_file, all_data, compact=compact, compress=compress, fsync=fsync)
 
         return all_data
 
-    def run(self):
+    def run(self, hostnames=None, workers=None, compact=False, compress=False, fsync=False):
         """Main workflow: fetch all devices + write snapshot"""
-        self.fetch_all()
+        self.fetch_all(
+            hostnames=hostnames,
+            workers=workers,
+            compact=compact,
+            compress=compress,
+            fsync=fsync,
+        )
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch network state into a JSON snapshot.")
+    parser.add_argument("hosts", nargs="*", help="Hostnames to fetch (default: all enabled devices)")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel device workers (1 = serial)")
+    parser.add_argument("--compact", action="store_true", help="Write the snapshot without indentation")
+    parser.add_argument("--zstd", action="store_true", help="Compress the snapshot (.json.zst, needs zstandard)")
+    parser.add_argument(
+        "--fsync", action=argparse.BooleanOptionalAction, default=False,
+        help="fsync the snapshot before exiting (default: let the OS flush it)",
+    )
+    args = parser.parse_args()
+
     fetcher = NetworkFetcher()
-    fetcher.run()
+    fetcher.run(
+        hostnames=args.hosts,
+        workers=args.workers,
+        compact=args.compact,
+        compress=args.zstd,
+        fsync=args.fsync,
+    )
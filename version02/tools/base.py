@@ -81,7 +81,9 @@ class BaseDeviceCollector(ABC):
 
         # Check if in config mode and exit if needed
         if self.connection:
-            prompt = self.connection.find_prompt()
+            # Cached prompt is refreshed by connect() and send_config_set(),
+            # and cleared when a config set fails
+            prompt = self.current_prompt or self.connection.find_prompt()
             if 'config' in prompt.lower():
                 self.connection.exit_config_mode()
 
@@ -120,13 +122,24 @@ class BaseDeviceCollector(ABC):
         if not self.is_connected():
             raise ConnectionError("Not connected to device")
 
+        # Match on the cached prompt: without expect_string Netmiko calls
+        # find_prompt() before every command (an extra device round-trip).
+        # Failed commands and config sets clear the cache, so a stale
+        # prompt falls back to Netmiko's own detection.
+        kwargs = {}
+        if self.current_prompt:
+            kwargs["expect_string"] = re.escape(self.current_prompt)
+
         try:
             output = self.connection.send_command(
                 command,
-                read_timeout=self.credentials.get("read_timeout", 60)
+                read_timeout=self.credentials.get("read_timeout", 60),
+                **kwargs
             )
             return output
         except Exception as e:
+            # Prompt may have changed under us: let Netmiko detect it next time
+            self.current_prompt = None
             raise Exception(f"Show command failed: {str(e)}")
 
     def send_config_set(self, commands):
@@ -164,6 +177,9 @@ class BaseDeviceCollector(ABC):
 
             return output
         except Exception as e:
+            # The device may be left in config mode: forget the cached
+            # prompt so disconnect() asks the device again
+            self.current_prompt = None
             raise Exception(f"Config command failed: {str(e)}")
 
     
@@ -8,6 +8,19 @@ import re
 
 
 _REGEX_CACHE = {}
+_REGEX_MD_TEXT = None
+
+
+def _regex_md_text():
+    """Read regex.md once per process (None when the file is missing)."""
+    global _REGEX_MD_TEXT
+    if _REGEX_MD_TEXT is None:
+        regex_path = Path(__file__).parent / "regex.md"
+        try:
+            _REGEX_MD_TEXT = regex_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+    return _REGEX_MD_TEXT
 
 
 def _load_regex_pattern(section_name, pattern_name=None):
@@ -16,10 +29,8 @@ def _load_regex_pattern(section_name, pattern_name=None):
     if cache_key in _REGEX_CACHE:
         return _REGEX_CACHE[cache_key]
 
-    regex_path = Path(__file__).parent / "regex.md"
-    try:
-        content = regex_path.read_text(encoding="utf-8")
-    except FileNotFoundError:
+    content = _regex_md_text()
+    if content is None:
         return None
 
     header = f"## {section_name}"
@@ -59,6 +70,31 @@ class Collector(BaseDeviceCollector):
 
 
 
+    def collect_all(self, calls, optional_calls=()):
+        """
+        Run several getters back to back over this one session.
+
+        Args:
+            calls: Mapping of result key -> getter name, e.g.
+                {"interfaces": "get_interface_brief", "vlans": "get_vlan_brief"}
+            optional_calls: Result keys whose getter may fail (returns [])
+
+        Returns:
+            dict: {result key: getter result}, in `calls` order
+        """
+        if not self.is_connected():
+            raise ConnectionError("Not connected to device")
+
+        results = {}
+        for key, method_name in calls.items():
+            try:
+                results[key] = getattr(self, method_name)()
+            except Exception:
+                if key not in optional_calls:
+                    raise
+                results[key] = []
+        return results
+
     def get_interface_brief(self, clean: bool = True):
         """
         Get concise interface status (IP addresses and up/down).
@@ -161,6 +197,23 @@ class Collector(BaseDeviceCollector):
 
             entries = split_re.split(raw_output)
 
+            # Resolve every pattern once, not once per neighbor entry
+            device_re = _load_regex_pattern("get_cdp_neighbors", "device")
+            if device_re is None:
+                raise ValueError("Regex pattern 'get_cdp_neighbors device' not found in regex.md")
+
+            ip_re = _load_regex_pattern("get_cdp_neighbors", "ip")
+            if ip_re is None:
+                raise ValueError("Regex pattern 'get_cdp_neighbors ip' not found in regex.md")
+
+            platform_re = _load_regex_pattern("get_cdp_neighbors", "platform")
+            if platform_re is None:
+                raise ValueError("Regex pattern 'get_cdp_neighbors platform' not found in regex.md")
+
+            interface_re = _load_regex_pattern("get_cdp_neighbors", "interface")
+            if interface_re is None:
+                raise ValueError("Regex pattern 'get_cdp_neighbors interface' not found in regex.md")
+
             neighbors = []
             for entry in entries:
                 if 'Device ID:' not in entry:
@@ -169,38 +222,22 @@ class Collector(BaseDeviceCollector):
                 neighbor = {}
 
                 # Extract Device ID
-                device_re = _load_regex_pattern("get_cdp_neighbors", "device")
-                if device_re is None:
-                    raise ValueError("Regex pattern 'get_cdp_neighbors device' not found in regex.md")
-
                 device_match = device_re.search(entry)
                 if device_match:
                     neighbor['neighbor_device'] = device_match.group(1)
 
                 # Extract IP address
-                ip_re = _load_regex_pattern("get_cdp_neighbors", "ip")
-                if ip_re is None:
-                    raise ValueError("Regex pattern 'get_cdp_neighbors ip' not found in regex.md")
-
                 ip_match = ip_re.search(entry)
                 if ip_match:
                     neighbor['neighbor_ip'] = ip_match.group(1)
 
                 # Extract Platform and Capabilities
-                platform_re = _load_regex_pattern("get_cdp_neighbors", "platform")
-                if platform_re is None:
-                    raise ValueError("Regex pattern 'get_cdp_neighbors platform' not found in regex.md")
-
                 platform_match = platform_re.search(entry)
                 if platform_match:
                     neighbor['platform'] = platform_match.group(1).strip()
                     neighbor['capabilities'] = platform_match.group(2).strip()
 
                 # Extract Interface and Port ID (local and neighbor interfaces)
-                interface_re = _load_regex_pattern("get_cdp_neighbors", "interface")
-                if interface_re is None:
-                    raise ValueError("Regex pattern 'get_cdp_neighbors interface' not found in regex.md")
-
                 interface_match = interface_re.search(entry)
                 if interface_match:
                     neighbor['local_interface'] = interface_match.group(1)
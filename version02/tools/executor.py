@@ -11,6 +11,7 @@ This implementation:
 
 import json
 import re
+import threading
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import logging
@@ -386,6 +387,10 @@ class ConfigExecutor:
 # Global device connection cache (singleton pattern)
 _DEVICE_CONNECTION: Optional[BaseDeviceCollector] = None
 
+# The agent runs the tool calls of one model turn concurrently; a single
+# CLI session cannot interleave config sets, so device access is serialized
+_DEVICE_LOCK = threading.Lock()
+
 
 def set_device_connection(device: BaseDeviceCollector) -> None:
     """
@@ -492,12 +497,13 @@ def execute_notebook(
         executor = ConfigExecutor(device)
 
         # Execute notebook
-        result = executor.apply_notebook(
-            notebook_id=notebook_id,
-            dry_run=dry_run,
-            auto_disconnect=False,  # Let agent manage connection lifecycle
-            **params
-        )
+        with _DEVICE_LOCK:
+            result = executor.apply_notebook(
+                notebook_id=notebook_id,
+                dry_run=dry_run,
+                auto_disconnect=False,  # Let agent manage connection lifecycle
+                **params
+            )
 
         logger.info(
             f"Executed notebook '{notebook_id}' - "
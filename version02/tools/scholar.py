@@ -43,13 +43,20 @@ logger = logging.getLogger(__name__)
 # INITIALIZATION
 # ============================================================================
 
+_initialized = False
+
+
 def init_environment() -> None:
-    """Load environment variables."""
+    """Load environment variables (once per process)."""
+    global _initialized
+    if _initialized:
+        return
     load_dotenv(ENV_PATH)
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY not set in configs/.env")
     genai.configure(api_key=api_key)
+    _initialized = True
 
 
 def load_vector_store(index_dir: Path = DEFAULT_INDEX_DIR) -> FAISS: